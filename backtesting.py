@@ -11,6 +11,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 from sklearn.metrics import roc_auc_score, precision_score, recall_score, f1_score
 
+# Shared generator for simulated features (PCG64, faster than the legacy global RNG)
+RNG = np.random.default_rng()
+
 def run_backtesting(start_date, end_date, output_dir="backtest_results"):
     """
     Run a comprehensive backtesting of the HR prediction system
@@ -78,8 +81,8 @@ def run_backtesting(start_date, end_date, output_dir="backtest_results"):
             )
             
             # Add other features
-            merged["pitch_matchup_score"] = np.random.uniform(0.1, 0.2, size=len(merged))  # Simplified for backtest
-            merged["bullpen_boost"] = np.random.uniform(0, 0.05, size=len(merged))  # Simplified for backtest
+            merged["pitch_matchup_score"] = RNG.uniform(0.1, 0.2, size=len(merged))  # Simplified for backtest
+            merged["bullpen_boost"] = RNG.uniform(0, 0.05, size=len(merged))  # Simplified for backtest
             
             # Apply park factors
             merged["park_factor"] = merged["home_team"].apply(lambda x: get_park_factor(x))
@@ -41,6 +41,8 @@ FORCE_TEST_MODE = "--test" in sys.argv
 DEBUG_MODE = "--debug" in sys.argv
 # Maximum number of API retries
 MAX_RETRIES = 3
+# Shared generator for simulated recent-form data
+RNG = np.random.default_rng()
 
 def parse_args():
     """Parse command line arguments"""
@@ -108,15 +110,15 @@ def enhance_batter_data(batters_df):
         # you'd calculate these from recent statcast data)
         if not batters_df.empty:
             # Add "last 7 days" metrics
-            batters_df['last_7_iso'] = batters_df['ISO'] * (0.8 + (0.4 * np.random.random(len(batters_df))))
-            batters_df['last_7_barrel'] = batters_df['barrel_rate_50'] * (0.7 + (0.6 * np.random.random(len(batters_df))))
+            batters_df['last_7_iso'] = batters_df['ISO'] * (0.8 + (0.4 * RNG.random(len(batters_df))))
+            batters_df['last_7_barrel'] = batters_df['barrel_rate_50'] * (0.7 + (0.6 * RNG.random(len(batters_df))))
             
             # Add recent HR rate (simplified approach)
-            batters_df['recent_hr_rate'] = batters_df['barrel_rate_50'] * 0.7 * (0.8 + (0.4 * np.random.random(len(batters_df))))
+            batters_df['recent_hr_rate'] = batters_df['barrel_rate_50'] * 0.7 * (0.8 + (0.4 * RNG.random(len(batters_df))))
             
             # Add stand orientation (L/R) - in production, get this from player data
             # Roughly 65% of batters are right-handed
-            batters_df['batter_stands'] = np.random.choice(['R', 'L'], size=len(batters_df), p=[0.65, 0.35])
+            batters_df['batter_stands'] = RNG.choice(['R', 'L'], size=len(batters_df), p=[0.65, 0.35])
             
         logger.info(f"✅ Enhanced {len(batters_df)} batter records")
     except Exception as e:
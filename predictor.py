@@ -6,6 +6,10 @@ model_path = "model.pkl"
 USE_MODEL = os.path.exists(model_path)
 model = joblib.load(model_path) if USE_MODEL else None
 
+# n_jobs is not reliably restored on unpickle; re-set it so inference stays parallel
+if model is not None and hasattr(model, "n_jobs"):
+    model.n_jobs = -1
+
 # Add to predictor.py - place after the existing generate_hr_predictions function
 
 def generate_enhanced_hr_predictions(df):
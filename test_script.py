@@ -4,6 +4,8 @@ Test script to verify the fixes to the MLB HR prediction system
 """
 
 import os
+import shutil
+import subprocess
 import sys
 import pandas as pd
 import time
@@ -17,13 +19,19 @@ def main():
     
     # Step 1: Clear all cache to ensure fresh data
     print("\n🧹 Clearing cache data...")
-    os.system("rm -rf cache/*")
+    shutil.rmtree("cache", ignore_errors=True)
+    os.makedirs("cache", exist_ok=True)
     print("✅ Cache cleared")
     
     # Step 2: Run the main script in test mode with debug output
     print("\n🧪 Running main.py in test mode...")
     start_time = time.time()
-    os.system("python main.py --test --debug > test_output.log 2>&1")
+    with open("test_output.log", "w") as log:
+        subprocess.run(
+            [sys.executable, "main.py", "--test", "--debug"],
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
     end_time = time.time()
     print(f"✅ Test run completed in {end_time - start_time:.2f} seconds")
     
@@ -38,8 +46,9 @@ def main():
         print("❌ No output file generated!")
         return False
     
-    # Read the output file
-    df = pd.read_csv(output_file)
+    # Read the output file (only the columns this script inspects)
+    used_columns = ['batter_name', 'HR_Score', 'matchup_score', 'ballpark', 'opposing_pitcher']
+    df = pd.read_csv(output_file, usecols=lambda col: col in used_columns)
     
     print(f"✅ Output file found with {len(df)} predictions")
     
@@ -60,7 +69,7 @@ def main():
         
         # Show top 10 predictions
         print("\nTop 10 HR predictions:")
-        top_10 = df.sort_values('matchup_score', ascending=False).head(10)
+        top_10 = df.nlargest(10, 'matchup_score')
         for _, row in top_10.iterrows():
             print(f"- {row['batter_name']} vs {row['opposing_pitcher']} ({row['matchup_score']:.3f})")
     
@@ -0,0 +1,228 @@
+# tests/test_weather.py
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+import orjson
+import pandas as pd
+import weather
+from weather import calculate_enhanced_wind_boost, calculate_enhanced_wind_boost_vec, get_team_from_ballpark
+
+class TestWeather(unittest.TestCase):
+
+    def test_wind_boost_matches_original_formula(self):
+        # (speed, direction, temp) -> value from the original scalar implementation,
+        # including values that sit on a rounding boundary
+        cases = [
+            ((12.0, 180, 25.0), 0.028),
+            ((8.0, 0, 15.0), -0.034),
+            ((0.0, None, 5.5), -0.07),
+            ((20.0, 270, None), -0.003),
+            ((5.0, 90, 30.0), 0.038),
+            ((30.0, 359, 0), -0.021),
+            ((2.0, 0, 25.0), 0.013),
+            ((8.0, None, 10.0), -0.049),
+            ((20.0, 180, 25.0), 0.037),
+        ]
+        speeds, directions, temps = zip(*(inputs for inputs, _ in cases))
+        expected = [boost for _, boost in cases]
+
+        vec = calculate_enhanced_wind_boost_vec(
+            speeds,
+            [np.nan if direction is None else direction for direction in directions],
+            [np.nan if temp is None else temp for temp in temps]
+        )
+        self.assertEqual(vec.tolist(), expected)
+        self.assertEqual([calculate_enhanced_wind_boost(*inputs) for inputs, _ in cases], expected)
+
+    def test_wind_boost_direction(self):
+        # Blowing out should help more than blowing in at the same speed and temperature
+        boosts = calculate_enhanced_wind_boost_vec([15.0, 15.0], [180, 0], [22.0, 22.0])
+        self.assertGreater(boosts[0], boosts[1])
+
+    def test_park_factor_table_matches_scalar(self):
+        teams = list(weather.PARK_FACTORS) + ["XXX", None]
+        sides = ['L', 'R', 'S', None]
+        temps = [None, 0.0, 25.0, 25.1, 35.0]
+        directions = [None, 0, 19.9, 20, 159.9, 160, 199.9, 200, 339.9, 340, 359.9]
+        grid = [
+            (team, side, temp, direction)
+            for team in teams for side in sides for temp in temps for direction in directions
+        ]
+        team_codes, stands, grid_temps, grid_directions = zip(*grid)
+
+        factors = weather.compute_park_factors(
+            team_codes, stands,
+            [np.nan if direction is None else direction for direction in grid_directions],
+            [np.nan if temp is None else temp for temp in grid_temps]
+        )
+        expected = [
+            weather.get_enhanced_park_factor(team, {
+                'batter_stands': side, 'temperature': temp, 'wind_direction': direction
+            })
+            for team, side, temp, direction in grid
+        ]
+        self.assertEqual(factors.tolist(), expected)
+
+    def test_team_from_ballpark(self):
+        self.assertEqual(get_team_from_ballpark("Wrigley Field"), "CHC")
+        self.assertEqual(get_team_from_ballpark("fenway park, Boston, MA"), "BOS")
+        self.assertIsNone(get_team_from_ballpark("Unknown Ballpark"))
+
+    def test_apply_weather_boosts_handles_missing_string_cells(self):
+        # pd.NA in string columns must count as missing, not abort the whole slate
+        df = pd.DataFrame({
+            "home_team": pd.array(["NYY", pd.NA, pd.NA], dtype="string"),
+            "ballpark": pd.array([pd.NA, "Fenway Park", pd.NA], dtype="string"),
+            "batter_stands": pd.array(["L", "R", pd.NA], dtype="string"),
+        })
+        with mock.patch.object(weather, "_WEATHER_ENABLED", False):
+            result = weather.apply_enhanced_weather_boosts(df)
+
+        self.assertEqual(result["home_team"].tolist()[:2], ["NYY", "BOS"])
+        self.assertEqual(result["ballpark"].tolist()[:2], ["Yankee Stadium", "Fenway Park"])
+        np.testing.assert_allclose(result["park_factor"], [1.12, 1.07, 1.0], atol=1e-6)
+
+    def test_roofed_parks_skip_every_fetch_path(self):
+        roofed = weather.BALLPARK_LOCATIONS["TB"]
+        with mock.patch.object(weather, "_WEATHER_ENABLED", True), \
+             mock.patch.object(weather.SESSION, "get", side_effect=AssertionError("network used")):
+            self.assertEqual(weather.fetch_weather_group([roofed]), {})
+            results = weather.fetch_all_weather([roofed])
+
+        self.assertIs(type(results[roofed]), dict)
+        self.assertTrue(results[roofed]["roofed"])
+        # Each caller gets its own copy
+        results[roofed]["main"]["temp"] = 0
+        self.assertEqual(weather.fetch_weather_data(roofed)["main"]["temp"], 22.0)
+
+    def test_apply_weather_boosts_with_weather(self):
+        # Duplicate index labels and no weather columns yet, as in a raw prediction slate
+        df = pd.DataFrame({
+            "home_team": [None, "NYY", "TB", None],
+            "ballpark": ["Wrigley Field", None, "Tropicana Field", None],
+            "batter_stands": ["R", "L", "R", "L"],
+        }, index=[7, 7, 3, 3])
+        fetched = {
+            "Chicago,US": {"main": {"temp": 28}, "wind": {"speed": 10, "deg": 180}},
+            "Bronx,US": {"main": {"temp": 15}, "wind": {"speed": 5, "deg": 0}},
+        }
+        with mock.patch.object(weather, "_WEATHER_ENABLED", True), \
+             mock.patch.object(weather, "fetch_all_weather", return_value=fetched) as fetch_all, \
+             mock.patch.object(weather, "flush_weather_cache"):
+            result = weather.apply_enhanced_weather_boosts(df)
+
+        # The roofed park is never fetched
+        self.assertEqual(sorted(fetch_all.call_args[0][0]), ["Bronx,US", "Chicago,US"])
+        self.assertEqual(result.index.tolist(), [7, 7, 3, 3])
+        # Home team inferred from the ballpark, and the ballpark filled from the home team
+        self.assertEqual(result["home_team"].tolist()[:3], ["CHC", "NYY", "TB"])
+        self.assertEqual(result["ballpark"].tolist()[:3], ["Wrigley Field", "Yankee Stadium", "Tropicana Field"])
+        for column in ("temperature", "wind_speed", "wind_direction", "wind_boost", "park_factor"):
+            self.assertEqual(result[column].dtype, np.float32)
+        np.testing.assert_allclose(result["temperature"], [28, 15, 22, 20])
+        np.testing.assert_allclose(result["wind_speed"], [10, 5, 0, 0])
+        np.testing.assert_allclose(result["wind_direction"], [180, 0, np.nan, np.nan])
+        np.testing.assert_allclose(result["wind_boost"], [0.039, -0.032, 0.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose(result["park_factor"], [1.12, 1.12, 0.97, 1.0], atol=1e-6)
+
+    def test_apply_weather_boosts_without_api_key(self):
+        df = pd.DataFrame({"home_team": ["COL", "SF"], "batter_stands": ["R", "L"], "wind_boost": [0.5, 0.5]})
+        with mock.patch.object(weather, "_WEATHER_ENABLED", False), \
+             mock.patch.object(weather, "fetch_all_weather") as fetch_all:
+            result = weather.apply_enhanced_weather_boosts(df)
+
+        fetch_all.assert_not_called()
+        self.assertEqual(result["ballpark"].tolist(), ["Coors Field", "Oracle Park"])
+        np.testing.assert_allclose(result["park_factor"], [1.15, 0.85], atol=1e-6)
+        # Existing columns are kept, and weather columns keep their defaults
+        self.assertEqual(result["wind_boost"].tolist(), [0.5, 0.5])
+        np.testing.assert_allclose(result["temperature"], [20, 20])
+
+    def test_retry_delay_honours_retry_after_within_bounds(self):
+        self.assertEqual(weather._retry_delay(0, 429, "-1"), 0)
+        self.assertEqual(weather._retry_delay(0, 429, "0"), 0)
+        self.assertGreaterEqual(weather._retry_delay(0, 429, "5"), 5)
+        self.assertLessEqual(weather._retry_delay(0, 429, "3600"), weather.MAX_RETRY_DELAY * 1.25)
+
+    def test_cached_weather_ttl(self):
+        now = time.time()
+        cache = {
+            "fresh": {"fetched_at": now},
+            "stale": {"fetched_at": now - weather.WEATHER_CACHE_TTL},
+            "placeholder": {"_default": True},
+        }
+        with mock.patch.object(weather, "WEATHER_CACHE", cache):
+            self.assertIs(weather.get_cached_weather("fresh"), cache["fresh"])
+            self.assertIsNone(weather.get_cached_weather("stale"))
+            self.assertIsNone(weather.get_cached_weather("missing"))
+            # Defaults only count as cached while there's no API key
+            with mock.patch.object(weather, "_WEATHER_ENABLED", True):
+                self.assertIsNone(weather.get_cached_weather("placeholder"))
+            with mock.patch.object(weather, "_WEATHER_ENABLED", False):
+                self.assertIs(weather.get_cached_weather("placeholder"), cache["placeholder"])
+
+    def test_expired_reading_survives_api_failure(self):
+        reading = {
+            "date": weather._today_str(), "fetched_at": time.time() - 700,
+            "main": {"temp": 31}, "wind": {"speed": 9, "deg": 175},
+        }
+        unavailable = mock.Mock(status_code=503, headers={})
+        unavailable.raise_for_status.side_effect = weather.requests.exceptions.HTTPError(response=unavailable)
+
+        with tempfile.TemporaryDirectory() as tmp, \
+             mock.patch.object(weather, "WEATHER_CACHE_FILE", os.path.join(tmp, "weather_cache.json")), \
+             mock.patch.object(weather, "WEATHER_CACHE", {"Chicago,US": reading}), \
+             mock.patch.object(weather, "_CACHE_LOADED", True), \
+             mock.patch.object(weather, "_CACHE_MTIME", None), \
+             mock.patch.object(weather, "_WEATHER_ENABLED", True), \
+             mock.patch.object(weather, "_BREAKER_FAILURES", 0), \
+             mock.patch.object(weather, "_BREAKER_OPEN_UNTIL", 0.0), \
+             mock.patch.object(weather.SESSION, "get", return_value=unavailable), \
+             mock.patch.object(weather.time, "sleep"):
+            # Retries run out: the last real reading is kept rather than the placeholder
+            self.assertIs(weather.fetch_weather_data("Chicago,US"), reading)
+            self.assertIs(weather.WEATHER_CACHE["Chicago,US"], reading)
+
+            # Same while the circuit breaker is open
+            with mock.patch.object(weather, "_BREAKER_OPEN_UNTIL", float("inf")):
+                self.assertIs(weather.fetch_weather_data("Chicago,US"), reading)
+                # Only a location without a real reading gets the default
+                self.assertTrue(weather.fetch_weather_data("Boston,US")["_default"])
+
+            weather.save_weather_cache(weather.WEATHER_CACHE)
+            with open(weather.WEATHER_CACHE_FILE, "rb") as f:
+                saved = orjson.loads(f.read())
+        self.assertEqual(list(saved), ["Chicago,US"])
+
+    def test_cache_file_merges_with_memory(self):
+        today = weather._today_str()
+        on_disk = {
+            "Boston,US": {"date": today, "fetched_at": 200, "main": {"temp": 18}},
+            "Denver,US": {"date": today, "fetched_at": 50, "main": {"temp": 5}},
+            "Miami,US": {"date": "2000-01-01", "fetched_at": 300, "main": {"temp": 30}},
+        }
+        in_memory = {
+            "Boston,US": {"date": today, "fetched_at": 100, "main": {"temp": 10}},
+            "Denver,US": {"date": today, "fetched_at": 100, "main": {"temp": 25}},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = os.path.join(tmp, "weather_cache.json")
+            with open(cache_file, "wb") as f:
+                f.write(orjson.dumps(on_disk))
+            with mock.patch.object(weather, "WEATHER_CACHE_FILE", cache_file), \
+                 mock.patch.object(weather, "WEATHER_CACHE", dict(in_memory)), \
+                 mock.patch.object(weather, "_CACHE_LOADED", False), \
+                 mock.patch.object(weather, "_CACHE_MTIME", None):
+                weather.ensure_weather_cache_loaded()
+                merged = dict(weather.WEATHER_CACHE)
+
+        # The newer fetch wins for each location, and other days' entries are ignored
+        self.assertEqual(merged["Boston,US"]["main"]["temp"], 18)
+        self.assertEqual(merged["Denver,US"]["main"]["temp"], 25)
+        self.assertNotIn("Miami,US", merged)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,12 @@
 # train_model.py
 
+import os
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 
-# Load labeled data — make sure this file exists and has 'Hit_HR' column
-df = pd.read_csv("results/accuracy_log.csv")
-
-# Filter for valid rows
-df = df[df["HR_Score"].notna() & df["Hit_HR"].notna()]
-
 # Features to train on — must match those used in main.py
 model_features = [
     "ISO",
@@ -24,24 +19,75 @@ model_features = [
     "pitcher_hr_suppression"
 ]
 
+# Only parse the columns we actually use
+needed_columns = ["HR_Score"] + model_features + ["Hit_HR"]
+
+# Load labeled data — make sure this file exists and has 'Hit_HR' column
+df = pd.read_csv(
+    "results/accuracy_log.csv",
+    usecols=lambda col: col in needed_columns,
+    dtype={col: "float32" for col in needed_columns}
+)
+log_rows = len(df)
+
+# Filter for valid rows
+df = df[df["HR_Score"].notna() & df["Hit_HR"].notna()]
+
 # Drop rows with missing feature data
 df = df.dropna(subset=model_features + ["Hit_HR"])
 
-X = df[model_features]
-y = df["Hit_HR"]
+X = df[model_features].astype(np.float32)
+y = df["Hit_HR"].astype(np.int8)
+
+# Fixed holdout: every 5th row of the log by its line position. The log is
+# append-only, so a row never moves between train and test across reruns and
+# trees grown on earlier runs never see test rows
+is_test = df.index % 5 == 0
+X_train, X_test = X[~is_test], X[is_test]
+y_train, y_test = y[~is_test], y[is_test]
+
+# Trees added to an existing forest on each rerun, and the size at which the
+# forest is rebuilt from scratch instead of growing further
+NEW_TREES_PER_RUN = 20
+MAX_TREES = 300
 
-# Split for validation
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+# Reuse the saved forest when it was trained on the same features, and grow it
+# with trees fit only on the rows appended to the log since it was saved
+model = None
+if os.path.exists("model.pkl"):
+    previous = joblib.load("model.pkl")
+    seen_rows = getattr(previous, "training_log_rows_", None)
+    if (isinstance(previous, RandomForestClassifier)
+            and list(getattr(previous, "feature_names_in_", [])) == model_features
+            and seen_rows is not None
+            and len(previous.estimators_) + NEW_TREES_PER_RUN <= MAX_TREES):
+        new_rows = X_train.index >= seen_rows
+        if not new_rows.any():
+            model = previous
+            print(f"♻️ No new training rows, keeping model.pkl ({len(model.estimators_)} trees)")
+        elif set(y_train[new_rows]) == set(previous.classes_):
+            model = previous
+            model.set_params(
+                warm_start=True,
+                n_estimators=len(model.estimators_) + NEW_TREES_PER_RUN,
+                n_jobs=-1
+            )
+            model.fit(X_train[new_rows], y_train[new_rows])
+            print(f"♻️ Added {NEW_TREES_PER_RUN} trees for {new_rows.sum()} new rows "
+                  f"({len(model.estimators_)} trees)")
+        # New rows that don't cover every class can't be fit alone, so rebuild below
 
-# Train model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+# Train model from scratch
+if model is None:
+    model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    model.fit(X_train, y_train)
+model.training_log_rows_ = log_rows
 
 # Evaluate
 print("📊 Model Evaluation on Test Set:")
 y_pred = model.predict(X_test)
 print(classification_report(y_test, y_pred))
 
-# Save model
-joblib.dump(model, "model.pkl")
+# Save model (zlib-compressed; tree arrays are mostly repeated node values)
+joblib.dump(model, "model.pkl", compress=3)
 print("✅ model.pkl saved successfully.")
@@ -1,5 +1,6 @@
 from pybaseball import statcast
 from datetime import date
+import numpy as np
 import pandas as pd
 import os
 
@@ -10,21 +11,18 @@ def update_local_csv(prediction_file):
     try:
         df = pd.read_csv(prediction_file)
         actual_stats = statcast(today, today)
-        hr_hitters = actual_stats[actual_stats['events'] == 'home_run']['player_name'].unique()
+        hr_hitters = set(actual_stats.loc[actual_stats['events'] == 'home_run', 'player_name'].unique())
 
         # Add actual outcome
-        df['Hit_HR'] = df['batter_name'].apply(lambda name: 1 if name in hr_hitters else 0)
+        df['Hit_HR'] = df['batter_name'].isin(hr_hitters).astype('int8')
 
-        # Add prediction type
-        def get_type(score):
-            if score >= 0.40:
-                return "Lock"
-            elif score >= 0.25:
-                return "Sleeper"
-            else:
-                return "Risky"
-
-        df["Prediction_Type"] = df["HR_Score"].apply(get_type)
+        # Add prediction type (Lock >= 0.40, Sleeper >= 0.25, otherwise Risky)
+        df["Prediction_Type"] = pd.cut(
+            df["HR_Score"].fillna(-np.inf),
+            bins=[-np.inf, 0.25, 0.40, np.inf],
+            labels=["Risky", "Sleeper", "Lock"],
+            right=False
+        ).astype(str)
 
         # Save updated prediction file
         df.to_csv(prediction_file, index=False)
@@ -41,13 +39,8 @@ def update_local_csv(prediction_file):
         log_file = "results/accuracy_log.csv"
         os.makedirs("results", exist_ok=True)
 
-        if os.path.exists(log_file):
-            existing = pd.read_csv(log_file)
-            combined = pd.concat([existing, grouped], ignore_index=True)
-        else:
-            combined = grouped
-
-        combined.to_csv(log_file, index=False)
+        # Append today's rows rather than re-reading and rewriting the whole log
+        grouped.to_csv(log_file, mode="a", index=False, header=not os.path.exists(log_file))
         print("📈 Logged accuracy summary.")
 
     except Exception as e:
@@ -1,9 +1,15 @@
+import functools
 import unicodedata
 
+# Drop periods and turn spaces into underscores in a single pass
+_NAME_TRANSLATION = str.maketrans({".": None, " ": "_"})
+
+@functools.lru_cache(maxsize=4096)
+def normalize_name(name):
+    """Normalize a player name for use in IDs (cached, names repeat all slate)."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("utf-8")
+    return name.strip().lower().replace(" jr.", "").translate(_NAME_TRANSLATION)
+
 def generate_game_id(batter_name, pitcher_name, game_date):
     """Create a normalized game ID for batter vs pitcher matchups."""
-    def normalize(name):
-        name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("utf-8")
-        return name.strip().lower().replace(" jr.", "").replace(".", "").replace(" ", "_")
-
-    return f"{normalize(batter_name)}__vs__{normalize(pitcher_name)}__{game_date}"
+    return f"{normalize_name(batter_name)}__vs__{normalize_name(pitcher_name)}__{game_date}"
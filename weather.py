@@ -1,15 +1,31 @@
+import asyncio
+import aiohttp
 import requests
+import orjson
 import os
+import random
+import re
+import numpy as np
 import pandas as pd
 import time
-import json
+import atexit
+import functools
+from types import MappingProxyType
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
 OPENWEATHER_API = os.getenv("OPENWEATHER_API")
 
+# Checked once at import so hot paths can skip weather work without an API key
+_WEATHER_ENABLED = bool(OPENWEATHER_API)
+
+# Query parameters shared by every OpenWeather request
+_WEATHER_PARAMS = {"appid": OPENWEATHER_API, "units": "metric"}
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,21 +37,194 @@ logging.basicConfig(
 )
 logger = logging.getLogger("weather")
 
+# OpenWeather current-weather endpoint
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+# OpenWeather group endpoint, which returns up to GROUP_SIZE cities by ID in one request
+GROUP_URL = "https://api.openweathermap.org/data/2.5/group"
+GROUP_SIZE = 20
+
+# Location -> OpenWeather city ID, learned from earlier API responses
+CITY_IDS = {}
+
+# Shared HTTP session so repeated lookups reuse the same keep-alive connection
+# (retries are handled in fetch_weather_data for backoff). Only one host is used and
+# sync fetches run one at a time (concurrent fetches go through aiohttp), so a small pool is enough
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=Retry(total=0)))
+
+# Upper bound on how long a single retry waits, even if the server asks for longer
+MAX_RETRY_DELAY = 60
+
+# Circuit breaker: after this many consecutive retryable failures (429/5xx/network),
+# stop calling OpenWeather for BREAKER_COOLDOWN seconds
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+_BREAKER_FAILURES = 0
+_BREAKER_OPEN_UNTIL = 0.0
+
+# Concurrent request limits for the async fetches (adjusted AIMD-style at runtime)
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 2
+MAX_CONCURRENCY = 32
+
 # Cache for weather data to reduce API calls
 WEATHER_CACHE = {}
 WEATHER_CACHE_FILE = "cache/weather_cache.json"
+# OpenWeather refreshes roughly every 10 minutes, so fetched data expires after that
+WEATHER_CACHE_TTL = 600
+# Set when WEATHER_CACHE has new API data that hasn't been written to disk yet
+_CACHE_DIRTY = False
+# Cached date string used to stamp cache entries, and when it stops being valid (local midnight)
+_TODAY = None
+_TODAY_UNTIL = 0.0
+# Whether the cache file has been read, and its mtime as of our last read or write
+_CACHE_LOADED = False
+_CACHE_MTIME = None
+
+# Team code -> ballpark city used for weather lookups (read-only, shared by every caller)
+BALLPARK_LOCATIONS = MappingProxyType({
+    "ARI": "Phoenix,US",
+    "ATL": "Atlanta,US",
+    "BAL": "Baltimore,US",
+    "BOS": "Boston,US",
+    "CHC": "Chicago,US",
+    "CWS": "Chicago,US",
+    "CIN": "Cincinnati,US",
+    "CLE": "Cleveland,US",
+    "COL": "Denver,US",
+    "DET": "Detroit,US",
+    "HOU": "Houston,US",
+    "KC": "Kansas City,US",
+    "LAA": "Anaheim,US",
+    "LAD": "Los Angeles,US",
+    "MIA": "Miami,US",
+    "MIL": "Milwaukee,US",
+    "MIN": "Minneapolis,US",
+    "NYM": "Queens,US",
+    "NYY": "Bronx,US",
+    "OAK": "Oakland,US",
+    "PHI": "Philadelphia,US",
+    "PIT": "Pittsburgh,US",
+    "SD": "San Diego,US",
+    "SF": "San Francisco,US",
+    "SEA": "Seattle,US",
+    "STL": "St. Louis,US",
+    "TB": "St. Petersburg,US",
+    "TEX": "Arlington,US",
+    "TOR": "Toronto,CA",
+    "WSH": "Washington,US"
+})
+
+# Team code -> ballpark name (read-only, shared by every caller)
+BALLPARK_NAMES = MappingProxyType({
+    "ARI": "Chase Field",
+    "ATL": "Truist Park",
+    "BAL": "Oriole Park at Camden Yards",
+    "BOS": "Fenway Park",
+    "CHC": "Wrigley Field",
+    "CWS": "Guaranteed Rate Field",
+    "CIN": "Great American Ball Park",
+    "CLE": "Progressive Field",
+    "COL": "Coors Field",
+    "DET": "Comerica Park",
+    "HOU": "Minute Maid Park",
+    "KC": "Kauffman Stadium",
+    "LAA": "Angel Stadium",
+    "LAD": "Dodger Stadium",
+    "MIA": "LoanDepot Park",
+    "MIL": "American Family Field",
+    "MIN": "Target Field",
+    "NYM": "Citi Field",
+    "NYY": "Yankee Stadium",
+    "OAK": "Oakland Coliseum",
+    "PHI": "Citizens Bank Park",
+    "PIT": "PNC Park",
+    "SD": "Petco Park",
+    "SF": "Oracle Park",
+    "SEA": "T-Mobile Park",
+    "STL": "Busch Stadium",
+    "TB": "Tropicana Field",
+    "TEX": "Globe Life Field",
+    "TOR": "Rogers Centre",
+    "WSH": "Nationals Park"
+})
+
+# Base HR park factors by team code
+PARK_FACTORS = MappingProxyType({
+    "COL": 1.15,  # Coors Field - elevation helps HRs
+    "CIN": 1.10,  # Great American Ball Park - HR friendly
+    "NYY": 1.08,  # Yankee Stadium - short right field
+    "MIL": 1.06,  # American Family Field - retractable roof
+    "PHI": 1.05,  # Citizens Bank Park
+    "BAL": 1.04,  # Camden Yards 
+    "CHC": 1.02,  # Wrigley Field - depends on wind
+    "LAA": 1.02,  # Angel Stadium
+    "BOS": 1.01,  # Fenway Park
+    "TOR": 1.01,  # Rogers Centre
+    "ATL": 1.00,  # Truist Park
+    "CLE": 1.00,  # Progressive Field
+    "CWS": 1.00,  # Guaranteed Rate Field
+    "DET": 1.00,  # Comerica Park
+    "LAD": 0.99,  # Dodger Stadium
+    "STL": 0.99,  # Busch Stadium
+    "HOU": 0.98,  # Minute Maid Park
+    "MIN": 0.98,  # Target Field
+    "ARI": 0.97,  # Chase Field
+    "KC": 0.97,  # Kauffman Stadium
+    "NYM": 0.97,  # Citi Field
+    "OAK": 0.97,  # Oakland Coliseum
+    "PIT": 0.97,  # PNC Park
+    "TB": 0.97,  # Tropicana Field
+    "TEX": 0.97,  # Globe Life Field
+    "WSH": 0.97,  # Nationals Park
+    "MIA": 0.96,  # LoanDepot Park
+    "SEA": 0.95,  # T-Mobile Park
+    "SF": 0.90,   # Oracle Park - suppresses HRs
+    "SD": 0.92,   # Petco Park
+})
+
+# PARK_FACTORS as a Series, so whole columns of team codes resolve in one reindex
+PARK_FACTOR_SERIES = pd.Series(PARK_FACTORS, dtype=float)
+
+# Domes and retractable roofs that are usually closed in bad weather;
+# outdoor conditions don't apply, so these parks skip the weather API
+ROOFED_PARKS = {"TB", "ARI", "HOU", "MIL", "MIA", "TEX", "TOR", "SEA"}
+
+# Cities of the roofed parks (none of them is shared with an open-air park)
+ROOFED_LOCATIONS = frozenset(BALLPARK_LOCATIONS[team] for team in ROOFED_PARKS)
+
+# (temperature, wind speed, wind direction) for rows without weather
+NO_WEATHER_READINGS = (20.0, 0.0, np.nan)
+
+def _today_str():
+    """Today's date as YYYY-MM-DD, only reformatted once the day rolls over"""
+    global _TODAY, _TODAY_UNTIL
+    if time.time() >= _TODAY_UNTIL:
+        now = datetime.now()
+        _TODAY = now.strftime("%Y-%m-%d")
+        _TODAY_UNTIL = datetime.combine(now.date() + timedelta(days=1), datetime.min.time()).timestamp()
+    return _TODAY
+
+def remember_city_id(location, data):
+    """Record the OpenWeather city ID from a weather response for later group lookups"""
+    city_id = data.get("id") if isinstance(data, dict) else None
+    if city_id:
+        CITY_IDS[location] = city_id
 
 def load_weather_cache():
     """Load cached weather data if available"""
     if os.path.exists(WEATHER_CACHE_FILE):
         try:
-            with open(WEATHER_CACHE_FILE, 'r') as f:
-                cache = json.load(f)
+            with open(WEATHER_CACHE_FILE, 'rb') as f:
+                cache = orjson.loads(f.read())
                 
             # Convert cache to format we can use
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = _today_str()
             valid_cache = {}
             for location, data in cache.items():
+                # City IDs don't change, so learn them even from stale entries
+                remember_city_id(location, data)
                 if data.get("date") == today:
                     valid_cache[location] = data
                     
@@ -46,157 +235,438 @@ def load_weather_cache():
     
     return {}
 
+def _cache_file_mtime():
+    """Modification time of the cache file, or None if it doesn't exist"""
+    try:
+        return os.path.getmtime(WEATHER_CACHE_FILE)
+    except OSError:
+        return None
+
+def _remember_cache_mtime():
+    """Note the cache file's current mtime so our own writes don't trigger a reload"""
+    global _CACHE_MTIME
+    _CACHE_MTIME = _cache_file_mtime()
+
+def ensure_weather_cache_loaded():
+    """
+    Read the cache file into WEATHER_CACHE on first use, and again only when the
+    file has been rewritten since (e.g. by another pipeline process). Entries
+    already in memory win unless the file has a newer fetch for that location.
+    """
+    global _CACHE_LOADED, _CACHE_MTIME
+    mtime = _cache_file_mtime()
+    if _CACHE_LOADED and (mtime is None or (_CACHE_MTIME is not None and mtime <= _CACHE_MTIME)):
+        return
+    
+    for location, data in load_weather_cache().items():
+        current = WEATHER_CACHE.get(location)
+        if current is None or data.get("fetched_at", 0) > current.get("fetched_at", 0):
+            WEATHER_CACHE[location] = data
+    _CACHE_LOADED = True
+    _CACHE_MTIME = mtime
+
 def save_weather_cache(cache):
-    """Save weather cache to file"""
+    """Save weather cache to file (written to a temp file and renamed, so a crash can't leave it half-written)"""
     try:
         os.makedirs(os.path.dirname(WEATHER_CACHE_FILE), exist_ok=True)
-        with open(WEATHER_CACHE_FILE, 'w') as f:
-            json.dump(cache, f)
+        # Default placeholders would mask real data once the API is reachable again
+        cache = {location: data for location, data in cache.items() if not data.get("_default")}
+        tmp_file = WEATHER_CACHE_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(cache))
+        os.replace(tmp_file, WEATHER_CACHE_FILE)
+        _remember_cache_mtime()
         logger.info(f"✅ Saved {len(cache)} weather cache entries")
     except Exception as e:
         logger.error(f"⚠️ Error saving weather cache: {e}")
 
+def flush_weather_cache():
+    """Write the weather cache to disk once if anything new was fetched since the last save"""
+    global _CACHE_DIRTY
+    if _CACHE_DIRTY:
+        save_weather_cache(WEATHER_CACHE)
+        _CACHE_DIRTY = False
+
+# Don't lose fetches from callers that never reach an explicit flush
+atexit.register(flush_weather_cache)
+
+def _store_weather(location, data):
+    """Cache freshly fetched API data for a location and mark the cache for saving"""
+    global _CACHE_DIRTY
+    WEATHER_CACHE[location] = data
+    remember_city_id(location, data)
+    _CACHE_DIRTY = True
+
+def _trim_weather(raw):
+    """Keep only the parts of an OpenWeather response we use: city ID, temperature and wind"""
+    main = raw.get("main", {})
+    wind = raw.get("wind", {})
+    data = {
+        "main": {key: main[key] for key in ("temp",) if key in main},
+        "wind": {key: wind[key] for key in ("speed", "deg") if key in wind},
+    }
+    if "id" in raw:
+        data["id"] = raw["id"]
+    return data
+
+def default_weather():
+    """Reasonable default weather used when the API is unavailable"""
+    return {
+        "main": {"temp": 22},  # 22°C is a mild day
+        "wind": {"speed": 2.5, "deg": 180},  # Light breeze blowing out
+        "date": _today_str(),
+        "_default": True  # Placeholder, never saved to disk
+    }
+
+def roofed_weather():
+    """
+    Conditions used for roofed parks: mild and calm. Marked so callers can tell them
+    from real readings; the park is climate controlled, so its wind boost is 0
+    """
+    return {
+        "main": {"temp": 22.0},
+        "wind": {"speed": 0.0, "deg": None},
+        "date": _today_str(),
+        "roofed": True
+    }
+
+def get_cached_weather(location):
+    """Return cached weather for a location if it is still within the TTL"""
+    data = WEATHER_CACHE.get(location)
+    if data is None:
+        return None
+    
+    # Defaults only stand in while there's no API key; with one, fetch real data
+    if data.get("_default") and _WEATHER_ENABLED:
+        return None
+    
+    # Entries without a fetch time (defaults, older cache files) are valid for the day
+    fetched_at = data.get("fetched_at")
+    if fetched_at is not None and time.time() - fetched_at >= WEATHER_CACHE_TTL:
+        return None
+    return data
+
+def fallback_weather(location):
+    """
+    Weather to use when the API can't be reached: today's last real reading for the
+    location even if it's past the TTL, else default_weather(). A placeholder is only
+    cached where there's no real reading, so it never replaces one.
+    """
+    data = WEATHER_CACHE.get(location)
+    if data is not None and not data.get("_default") and data.get("date") == _today_str():
+        return data
+    default_data = default_weather()
+    WEATHER_CACHE[location] = default_data
+    return default_data
+
+def clear_weather_cache():
+    """Drop all in-memory weather cache entries"""
+    WEATHER_CACHE.clear()
+
+def _is_retryable(status):
+    """Network errors, rate limiting (429) and server errors are worth retrying; other 4xx are not"""
+    return status is None or status == 429 or status >= 500
+
+def _retry_delay(attempt, status=None, retry_after=None):
+    """Seconds to wait before the next attempt: the server's Retry-After on 429, else exponential backoff, plus jitter"""
+    delay = 2 ** attempt
+    if status == 429 and retry_after:
+        try:
+            delay = int(retry_after)
+        except ValueError:
+            pass  # HTTP-date form, keep exponential backoff
+    delay = max(0, min(delay, MAX_RETRY_DELAY))  # A negative header would make sleep() raise
+    return delay + random.uniform(0, 0.25 * delay)
+
+def _breaker_open():
+    """True while the circuit breaker is tripped and API calls should be skipped"""
+    return time.monotonic() < _BREAKER_OPEN_UNTIL
+
+def _record_api_result(ok):
+    """Track consecutive API failures and trip the circuit breaker at BREAKER_THRESHOLD"""
+    global _BREAKER_FAILURES, _BREAKER_OPEN_UNTIL
+    if ok:
+        _BREAKER_FAILURES = 0
+        return
+    _BREAKER_FAILURES += 1
+    if _BREAKER_FAILURES >= BREAKER_THRESHOLD:
+        _BREAKER_OPEN_UNTIL = time.monotonic() + BREAKER_COOLDOWN
+        _BREAKER_FAILURES = 0
+        logger.warning(f"⚠️ Weather API failing repeatedly, pausing requests for {BREAKER_COOLDOWN}s")
+
+class AdaptiveLimiter:
+    """
+    Async concurrency limit that adds half a slot after each success and
+    halves after throttling or server errors (additive increase, multiplicative decrease)
+    """
+    
+    def __init__(self, initial=INITIAL_CONCURRENCY, floor=MIN_CONCURRENCY, ceiling=MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.floor = floor
+        self.ceiling = ceiling
+        self._active = 0
+        self._condition = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < int(self.limit))
+            self._active += 1
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+    
+    def record_success(self):
+        self.limit = min(self.ceiling, self.limit + 0.5)
+    
+    def record_failure(self):
+        self.limit = max(self.floor, self.limit / 2)
+
 def fetch_weather_data(location):
     """Fetch weather data from OpenWeather API with improved error handling"""
-    global WEATHER_CACHE
+    # Roofed parks don't need outdoor weather, or a cache entry
+    if location in ROOFED_LOCATIONS:
+        return roofed_weather()
     
     # Initialize cache if needed
-    if not WEATHER_CACHE:
-        WEATHER_CACHE = load_weather_cache()
+    ensure_weather_cache_loaded()
     
     # Check cache first
-    if location in WEATHER_CACHE:
-        logger.info(f"✅ Using cached weather data for {location}")
-        return WEATHER_CACHE[location]
-    
-    # If no API key, use default values
-    if not OPENWEATHER_API:
-        logger.warning(f"⚠️ OpenWeather API key not found, using default weather for {location}")
-        default_data = {
-            "main": {"temp": 22},  # 22°C is a mild day
-            "wind": {"speed": 2.5, "deg": 180},  # Light breeze blowing out
-            "date": datetime.now().strftime("%Y-%m-%d")
-        }
-        WEATHER_CACHE[location] = default_data
-        return default_data
+    cached = get_cached_weather(location)
+    if cached is not None:
+        logger.debug(f"✅ Using cached weather data for {location}")
+        return cached
+    
+    # If no API key, use the last reading or default values
+    if not _WEATHER_ENABLED:
+        logger.warning(f"⚠️ OpenWeather API key not found, using last known or default weather for {location}")
+        return fallback_weather(location)
     
     # Try to fetch from API with retries
     max_retries = 3
+    params = {**_WEATHER_PARAMS, "q": location}
     for attempt in range(max_retries):
+        if _breaker_open():
+            logger.warning(f"⚠️ Weather API paused, using last known weather for {location}")
+            return fallback_weather(location)
         try:
             logger.info(f"🌤️ Fetching weather for {location} (attempt {attempt+1}/{max_retries})")
-            url = f"https://api.openweathermap.org/data/2.5/weather?q={location}&appid={OPENWEATHER_API}&units=metric"
-            response = requests.get(url, timeout=10)  # Add timeout
+            response = SESSION.get(WEATHER_URL, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Add date to track freshness
-            data["date"] = datetime.now().strftime("%Y-%m-%d")
+            data = _trim_weather(orjson.loads(response.content))
+            _record_api_result(True)
             
-            # Cache the result
-            WEATHER_CACHE[location] = data
+            # Add date and fetch time to track freshness
+            data["date"] = _today_str()
+            data["fetched_at"] = time.time()
             
-            # Save updated cache
-            save_weather_cache(WEATHER_CACHE)
+            # Cache the result; it's written to disk by flush_weather_cache
+            _store_weather(location, data)
             
             logger.info(f"✅ Weather data fetched for {location}")
             return data
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                wait_time = 2 ** attempt  # Exponential backoff
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            error_response = getattr(e, 'response', None)
+            status = error_response.status_code if error_response is not None else None
+            _record_api_result(not _is_retryable(status))
+            if _is_retryable(status) and attempt < max_retries - 1:
+                retry_after = error_response.headers.get('Retry-After') if error_response is not None else None
+                wait_time = _retry_delay(attempt, status, retry_after)
                 logger.warning(f"⚠️ Weather API attempt {attempt+1} failed for {location}, "
-                      f"retrying in {wait_time}s: {e}")
+                      f"retrying in {wait_time:.1f}s: {e}")
                 time.sleep(wait_time)
             else:
-                logger.error(f"❌ All weather API attempts failed for {location}: {e}")
-                # Provide reasonable default weather rather than failing
-                default_data = {
-                    "main": {"temp": 22},  # 22°C is a mild day
-                    "wind": {"speed": 2.5, "deg": 180},  # Light breeze blowing out
-                    "date": datetime.now().strftime("%Y-%m-%d")
-                }
-                WEATHER_CACHE[location] = default_data
-                return default_data
+                logger.error(f"❌ Weather API request failed for {location} after {attempt+1} attempt(s): {e}")
+                # Keep the last real reading (or a reasonable default) rather than failing
+                return fallback_weather(location)
     
     # Shouldn't get here, but just in case
     return None
 
+fetch_weather_data.cache_clear = clear_weather_cache
+
+async def fetch_weather_data_async(session, location, limiter=None):
+    """
+    Async version of fetch_weather_data for fetching many locations concurrently.
+    Like the sync version, falls back to fallback_weather() (the last real reading,
+    else defaults) when retries run out, and without calling the API while the
+    circuit breaker is open.
+    """
+    # Roofed, cached or key-less lookups don't need the network
+    if location in ROOFED_LOCATIONS or get_cached_weather(location) is not None or not _WEATHER_ENABLED:
+        return fetch_weather_data(location)
+    
+    limiter = limiter or AdaptiveLimiter()
+    max_retries = 3
+    params = {**_WEATHER_PARAMS, "q": location}
+    for attempt in range(max_retries):
+        try:
+            async with limiter:
+                # Checked after waiting for a slot, since the breaker may have tripped meanwhile
+                if _breaker_open():
+                    logger.warning(f"⚠️ Weather API paused, using last known weather for {location}")
+                    return fallback_weather(location)
+                logger.info(f"🌤️ Fetching weather for {location} (attempt {attempt+1}/{max_retries})")
+                async with session.get(WEATHER_URL, params=params) as response:
+                    response.raise_for_status()
+                    data = _trim_weather(orjson.loads(await response.read()))
+            limiter.record_success()
+            _record_api_result(True)
+            
+            # Add date and fetch time to track freshness
+            data["date"] = _today_str()
+            data["fetched_at"] = time.time()
+            _store_weather(location, data)
+            
+            logger.info(f"✅ Weather data fetched for {location}")
+            return data
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+            if _is_retryable(status):
+                limiter.record_failure()
+            _record_api_result(not _is_retryable(status))
+            if _is_retryable(status) and attempt < max_retries - 1:
+                retry_after = e.headers.get('Retry-After') if status is not None and e.headers else None
+                wait_time = _retry_delay(attempt, status, retry_after)
+                logger.warning(f"⚠️ Weather API attempt {attempt+1} failed for {location}, "
+                      f"retrying in {wait_time:.1f}s: {e}")
+                await asyncio.sleep(wait_time)
+            else:
+                logger.error(f"❌ Weather API request failed for {location} after {attempt+1} attempt(s): {e}")
+                return fallback_weather(location)
+    
+    return None
+
+def fetch_weather_group(locations):
+    """
+    Fetch weather for locations with a known city ID through the group endpoint,
+    GROUP_SIZE cities per request. Returns a dict of location -> weather data
+    for the locations that were fetched; anything missing should be fetched per city.
+    Roofed parks are skipped, since they don't use outdoor weather.
+    """
+    locations_by_id = {}
+    for location in locations:
+        if location in CITY_IDS and location not in ROOFED_LOCATIONS:
+            locations_by_id.setdefault(CITY_IDS[location], []).append(location)
+    
+    results = {}
+    city_ids = list(locations_by_id)
+    for start in range(0, len(city_ids), GROUP_SIZE):
+        if _breaker_open():
+            break
+        batch = city_ids[start:start + GROUP_SIZE]
+        try:
+            logger.info(f"🌤️ Fetching weather for {len(batch)} cities in one group request")
+            params = {**_WEATHER_PARAMS, "id": ",".join(str(city_id) for city_id in batch)}
+            response = SESSION.get(GROUP_URL, params=params, timeout=10)
+            response.raise_for_status()
+            payload = orjson.loads(response.content)
+            _record_api_result(True)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            error_response = getattr(e, 'response', None)
+            _record_api_result(not _is_retryable(error_response.status_code if error_response is not None else None))
+            logger.warning(f"⚠️ Weather group request failed, falling back to per-city requests: {e}")
+            continue
+        
+        for raw in payload.get("list", []):
+            data = _trim_weather(raw)
+            data["date"] = _today_str()
+            data["fetched_at"] = time.time()
+            for location in locations_by_id.get(data.get("id"), []):
+                _store_weather(location, data)
+                results[location] = data
+    
+    return results
+
+async def _fetch_all_weather(locations):
+    """Fetch all locations concurrently over one aiohttp session"""
+    timeout = aiohttp.ClientTimeout(total=10)
+    limiter = AdaptiveLimiter()
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        tasks = [asyncio.create_task(fetch_weather_data_async(session, location, limiter))
+                 for location in locations]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    return dict(zip(locations, results))
+
+def fetch_all_weather(locations):
+    """
+    Fetch weather for several locations concurrently.
+    Returns a dict of location -> weather data (or the exception raised for it).
+    Roofed parks get roofed_weather() without a request.
+    """
+    locations = list(locations)
+    results = {location: roofed_weather() for location in locations if location in ROOFED_LOCATIONS}
+    locations = [location for location in locations if location not in ROOFED_LOCATIONS]
+    if not locations:
+        return results
+    
+    # Initialize cache if needed
+    ensure_weather_cache_loaded()
+    
+    # Batch every location with a known city ID into group requests first;
+    # those become cache hits, and only the rest are fetched per city
+    if _WEATHER_ENABLED:
+        fetch_weather_group([location for location in locations if get_cached_weather(location) is None])
+    
+    # Only open an aiohttp session when something actually needs the network
+    results.update({location: get_cached_weather(location) for location in locations})
+    pending = [location for location in locations if results[location] is None]
+    if not pending:
+        return results
+    if not _WEATHER_ENABLED:
+        results.update({location: fetch_weather_data(location) for location in pending})
+        return results
+    
+    # asyncio.run can't be used inside a running event loop (e.g. notebooks),
+    # so fall back to sequential fetches there
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        results.update(asyncio.run(_fetch_all_weather(pending)))
+        return results
+    
+    results.update({location: fetch_weather_data(location) for location in pending})
+    return results
+
 def get_ballpark_locations():
     """Return a dictionary mapping team codes to ballpark cities."""
-    return {
-        "ARI": "Phoenix,US",
-        "ATL": "Atlanta,US",
-        "BAL": "Baltimore,US",
-        "BOS": "Boston,US",
-        "CHC": "Chicago,US",
-        "CWS": "Chicago,US",
-        "CIN": "Cincinnati,US",
-        "CLE": "Cleveland,US",
-        "COL": "Denver,US",
-        "DET": "Detroit,US",
-        "HOU": "Houston,US",
-        "KC": "Kansas City,US",
-        "LAA": "Anaheim,US",
-        "LAD": "Los Angeles,US",
-        "MIA": "Miami,US",
-        "MIL": "Milwaukee,US",
-        "MIN": "Minneapolis,US",
-        "NYM": "Queens,US",
-        "NYY": "Bronx,US",
-        "OAK": "Oakland,US",
-        "PHI": "Philadelphia,US",
-        "PIT": "Pittsburgh,US",
-        "SD": "San Diego,US",
-        "SF": "San Francisco,US",
-        "SEA": "Seattle,US",
-        "STL": "St. Louis,US",
-        "TB": "St. Petersburg,US",
-        "TEX": "Arlington,US",
-        "TOR": "Toronto,CA",
-        "WSH": "Washington,US"
-    }
+    return BALLPARK_LOCATIONS
 
 def get_ballpark_names():
     """Return a dictionary mapping team codes to ballpark names."""
-    return {
-        "ARI": "Chase Field",
-        "ATL": "Truist Park",
-        "BAL": "Oriole Park at Camden Yards",
-        "BOS": "Fenway Park",
-        "CHC": "Wrigley Field",
-        "CWS": "Guaranteed Rate Field",
-        "CIN": "Great American Ball Park",
-        "CLE": "Progressive Field",
-        "COL": "Coors Field",
-        "DET": "Comerica Park",
-        "HOU": "Minute Maid Park",
-        "KC": "Kauffman Stadium",
-        "LAA": "Angel Stadium",
-        "LAD": "Dodger Stadium",
-        "MIA": "LoanDepot Park",
-        "MIL": "American Family Field",
-        "MIN": "Target Field",
-        "NYM": "Citi Field",
-        "NYY": "Yankee Stadium",
-        "OAK": "Oakland Coliseum",
-        "PHI": "Citizens Bank Park",
-        "PIT": "PNC Park",
-        "SD": "Petco Park",
-        "SF": "Oracle Park",
-        "SEA": "T-Mobile Park",
-        "STL": "Busch Stadium",
-        "TB": "Tropicana Field",
-        "TEX": "Globe Life Field",
-        "TOR": "Rogers Centre",
-        "WSH": "Nationals Park"
-    }
+    return BALLPARK_NAMES
 
-def calculate_enhanced_wind_boost(wind_speed, wind_direction, temp):
-    """
-    Enhanced wind boost calculation that better accounts for 
-    directional effects and temperature
-    """
+# Lowercased ballpark name -> team code, built once for home team inference
+BALLPARK_TO_TEAM = {name.lower(): team for team, name in BALLPARK_NAMES.items()}
+
+# Matches any known ballpark name inside free text (longest names first),
+# so scraped values like "Wrigley Field, Chicago" still resolve in one pass
+BALLPARK_REGEX = re.compile(
+    "(" + "|".join(re.escape(name) for name in sorted(BALLPARK_TO_TEAM, key=len, reverse=True)) + ")"
+)
+
+@functools.lru_cache(maxsize=256)
+def get_team_from_ballpark(ballpark_name):
+    """Return the team code for a ballpark name (case-insensitive), or None."""
+    ballpark_name = ballpark_name.lower()
+    team = BALLPARK_TO_TEAM.get(ballpark_name)
+    if team is None:
+        match = BALLPARK_REGEX.search(ballpark_name)
+        if match:
+            team = BALLPARK_TO_TEAM[match.group(1)]
+    return team
+
+def _enhanced_wind_boost_unrounded(wind_speeds, wind_directions, temps):
+    """Wind boost formula shared by the vectorized and scalar versions"""
+    # Computed in float64 so rounding matches the original scalar formula exactly;
+    # callers cast the rounded result when storing it
+    wind_speeds = np.asarray(wind_speeds, dtype=float)
+    wind_directions = np.asarray(wind_directions, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    
     # Normalize wind direction to value between 0-1 where:
     # 1.0 = perfect tailwind (blowing out to center)
     # 0.0 = perfect headwind (blowing in from center)
@@ -204,104 +674,188 @@ def calculate_enhanced_wind_boost(wind_speed, wind_direction, temp):
     
     # Blowing out = ~180 degrees (normalize to 1.0)
     # Blowing in = ~0 or ~360 degrees (normalize to 0.0)
-    normalized_direction = 0
-    
-    if wind_direction is None:
-        normalized_direction = 0.5  # Neutral if unknown
-    else:
-        # Convert to value between 0-1, with 1 being blowing out
-        if wind_direction <= 180:
-            normalized_direction = wind_direction / 180.0  # 0->0, 90->0.5, 180->1
-        else:
-            normalized_direction = (360 - wind_direction) / 180.0  # 270->0.5, 360->0
+    # Distance from due north in one pass: 0->0, 90->0.5, 180->1, 270->0.5, 360->0
+    normalized_direction = np.minimum(wind_directions, 360 - wind_directions) / 180.0
+    normalized_direction = np.where(np.isnan(wind_directions), 0.5, normalized_direction)  # Neutral if unknown
     
     # Calculate directional factor (-0.1 to +0.15)
     direction_factor = (normalized_direction * 0.25) - 0.1
     
     # Speed factor (0 to 0.15)
-    speed_factor = min(wind_speed / 20.0, 1.0) * 0.15
+    speed_factor = np.minimum(wind_speeds / 20.0, 1.0) * 0.15
     
     # Temperature factor (-0.05 to +0.08)
     # Cold reduces HR, warm increases HR probability
-    temp_celsius = temp if temp else 20  # Default temp
+    temp_celsius = np.where(np.isnan(temps) | (temps == 0), 20, temps)  # Default temp
     temp_factor = ((temp_celsius - 10) / 30.0) * 0.13 - 0.05
     
     # Combined effect
-    return round(direction_factor * speed_factor + temp_factor, 3)
+    return direction_factor * speed_factor + temp_factor
 
-def get_enhanced_park_factor(team_code, weather_conditions=None):
+def calculate_enhanced_wind_boost_vec(wind_speeds, wind_directions, temps):
     """
-    Enhanced park factor that accounts for specific ballpark characteristics
-    and their interaction with weather conditions
+    Enhanced wind boost calculation that better accounts for 
+    directional effects and temperature, computed for whole columns at once.
+    Unknown wind directions should be passed as NaN.
     """
-    # Base park factors
-    base_factors = {
-        "COL": 1.15,  # Coors Field - elevation helps HRs
-        "CIN": 1.10,  # Great American Ball Park - HR friendly
-        "NYY": 1.08,  # Yankee Stadium - short right field
-        "MIL": 1.06,  # American Family Field - retractable roof
-        "PHI": 1.05,  # Citizens Bank Park
-        "BAL": 1.04,  # Camden Yards 
-        "CHC": 1.02,  # Wrigley Field - depends on wind
-        "LAA": 1.02,  # Angel Stadium
-        "BOS": 1.01,  # Fenway Park
-        "TOR": 1.01,  # Rogers Centre
-        "ATL": 1.00,  # Truist Park
-        "CLE": 1.00,  # Progressive Field
-        "CWS": 1.00,  # Guaranteed Rate Field
-        "DET": 1.00,  # Comerica Park
-        "LAD": 0.99,  # Dodger Stadium
-        "STL": 0.99,  # Busch Stadium
-        "HOU": 0.98,  # Minute Maid Park
-        "MIN": 0.98,  # Target Field
-        "ARI": 0.97,  # Chase Field
-        "KC": 0.97,  # Kauffman Stadium
-        "NYM": 0.97,  # Citi Field
-        "OAK": 0.97,  # Oakland Coliseum
-        "PIT": 0.97,  # PNC Park
-        "TB": 0.97,  # Tropicana Field
-        "TEX": 0.97,  # Globe Life Field
-        "WSH": 0.97,  # Nationals Park
-        "MIA": 0.96,  # LoanDepot Park
-        "SEA": 0.95,  # T-Mobile Park
-        "SF": 0.90,   # Oracle Park - suppresses HRs
-        "SD": 0.92,   # Petco Park
-    }
+    return _round3(_enhanced_wind_boost_unrounded(wind_speeds, wind_directions, temps))
+
+def _round3(values):
+    """Round to 3 places exactly like the builtin round()"""
+    # np.round scales by 1000 first, which can tip values sitting right on a
+    # rounding boundary the other way; redo just those few with round()
+    rounded = np.round(values, 3)
+    scaled = values * 1000.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 3) for value in values[near_tie].tolist()]
+    return rounded
+
+def calculate_enhanced_wind_boost(wind_speed, wind_direction, temp):
+    """Scalar version of calculate_enhanced_wind_boost_vec for a single ballpark"""
+    boost = _enhanced_wind_boost_unrounded(
+        [wind_speed],
+        [np.nan if wind_direction is None else wind_direction],
+        [np.nan if temp is None else temp]
+    )
+    return round(float(boost[0]), 3)
+
+# Conditions behind the special ballpark adjustments
+HOT_TEMP = 25  # degrees C; warmer than this is "hot"
+CHC_WIND_OUT = (160, 200)  # Wrigley wind blowing out, [from, to) degrees
+CHC_WIND_IN = (340, 20)  # Wrigley wind blowing in, wraps through north
+
+# Bucket numbers for batter side and Wrigley wind; anything else
+# (switch/unknown side, crosswind/unknown direction) falls in OTHER
+STAND_L, STAND_R, STAND_OTHER = 0, 1, 2
+WIND_OUT, WIND_IN, WIND_OTHER = 0, 1, 2
+
+def _stand_buckets(batter_stands):
+    """STAND_* bucket for each batter side"""
+    batter_stands = np.asarray(batter_stands, dtype=object)
+    return np.select([batter_stands == 'L', batter_stands == 'R'], [STAND_L, STAND_R], default=STAND_OTHER)
+
+def _hot_buckets(temps):
+    """True where the temperature is above HOT_TEMP"""
+    return np.asarray(temps, dtype=float) > HOT_TEMP
+
+def _wind_buckets(wind_directions):
+    """WIND_* bucket for each wind direction (NaN for unknown)"""
+    wd = np.asarray(wind_directions, dtype=float)
+    blowing_out = (wd >= CHC_WIND_OUT[0]) & (wd < CHC_WIND_OUT[1])
+    blowing_in = (wd >= CHC_WIND_IN[0]) | (wd < CHC_WIND_IN[1])
+    return np.select([blowing_out, blowing_in], [WIND_OUT, WIND_IN], default=WIND_OTHER)
+
+def _bucket_adjustments(team_codes, stands, hot, wind):
+    """Special adjustment for each row given its team code and condition buckets"""
+    team_codes = np.asarray(team_codes, dtype=object)
+    
+    # Shared masks, each computed once (object-array comparisons are the costly part)
+    is_chc = team_codes == "CHC"
+    is_bos = team_codes == "BOS"
+    lefty = stands == STAND_L
+    righty = stands == STAND_R
     
-    # Special cases for specific ballparks
-    special_adjustments = {
+    conditions = [
         # Yankee Stadium right field is very short
-        "NYY": lambda x: 0.04 if x.get('batter_stands') == 'L' else 0,
-        
-        # Wrigley Field is extremely wind-dependent
-        "CHC": lambda x: 0.10 if x.get('wind_direction') in range(160, 200) else 
-                        -0.08 if x.get('wind_direction') in range(340, 360) or x.get('wind_direction') in range(0, 20) else 0,
-        
+        (team_codes == "NYY") & lefty,
+        # Wrigley Field is extremely wind-dependent: blowing out vs blowing in
+        is_chc & (wind == WIND_OUT),
+        is_chc & (wind == WIND_IN),
         # Coors Field effect is amplified in hot weather
-        "COL": lambda x: 0.05 if x.get('temperature', 0) > 25 else 0,
-        
+        (team_codes == "COL") & hot,
         # Fenway Park's Green Monster effect
-        "BOS": lambda x: 0.06 if x.get('batter_stands') == 'R' else -0.02,
-        
+        is_bos & righty,
+        is_bos & ~righty,
         # Oracle Park is especially tough on left-handed power hitters
-        "SF": lambda x: -0.05 if x.get('batter_stands') == 'L' else 0,
-        
+        (team_codes == "SF") & lefty,
         # Citizens Bank Park plays smaller in warm weather
-        "PHI": lambda x: 0.03 if x.get('temperature', 0) > 25 else 0,
-    }
-    
+        (team_codes == "PHI") & hot,
+    ]
+    adjustments = [0.04, 0.10, -0.08, 0.05, 0.06, -0.02, -0.05, 0.03]
+    return np.select(conditions, adjustments, default=0.0)
+
+def _apply_park_adjustments(team_codes, batter_stands, wd, temp):
+    """
+    Special cases for specific ballparks, applied on top of PARK_FACTORS.
+    Takes equal-length arrays and returns the additive adjustment for each row.
+    """
+    return _bucket_adjustments(team_codes, _stand_buckets(batter_stands), _hot_buckets(temp), _wind_buckets(wd))
+
+def _build_park_factor_table():
+    """Park factor for every (team, side bucket, hot, wind bucket); the last team row is for unknown teams"""
+    teams, stands, hot, wind = np.meshgrid(
+        np.append(PARK_FACTOR_SERIES.index.to_numpy(dtype=object), None),
+        [STAND_L, STAND_R, STAND_OTHER], [False, True], [WIND_OUT, WIND_IN, WIND_OTHER], indexing='ij'
+    )
+    base = np.append(PARK_FACTOR_SERIES.to_numpy(), 1.0)[:, None, None, None]
+    adjustments = _bucket_adjustments(teams.ravel(), stands.ravel(), hot.ravel(), wind.ravel())
+    return _round3(base + adjustments.reshape(teams.shape))
+
+# The special adjustments only depend on the buckets above, so every park factor
+# outcome is precomputed once
+_PF_TABLE = _build_park_factor_table()
+
+def compute_park_factors(team_codes, batter_stands, wind_directions, temps):
+    """
+    Vectorized get_enhanced_park_factor: base factor plus special adjustments
+    for whole columns at once, read from the precomputed _PF_TABLE
+    (unknown teams get the neutral 1.0 base)
+    """
+    # Unknown teams come back as -1, which is the table's last (unknown) row
+    team_index = PARK_FACTOR_SERIES.index.get_indexer(np.asarray(team_codes, dtype=object))
+    return _PF_TABLE[
+        team_index,
+        _stand_buckets(batter_stands),
+        _hot_buckets(temps).astype(np.intp),
+        _wind_buckets(wind_directions)
+    ]
+
+def get_enhanced_park_factor(team_code, weather_conditions=None):
+    """
+    Enhanced park factor that accounts for specific ballpark characteristics
+    and their interaction with weather conditions
+    """
     # Get base factor
-    park_factor = base_factors.get(team_code, 1.0)
+    park_factor = PARK_FACTORS.get(team_code, 1.0)
     
     # Apply special adjustment if applicable
-    if team_code in special_adjustments and weather_conditions:
+    if weather_conditions:
         try:
-            adjustment = special_adjustments[team_code](weather_conditions)
-            park_factor += adjustment
+            wind_direction = weather_conditions.get('wind_direction')
+            park_factor += _apply_park_adjustments(
+                [team_code],
+                [weather_conditions.get('batter_stands')],
+                [np.nan if wind_direction is None else wind_direction],
+                [weather_conditions.get('temperature', 0)]
+            )[0]
         except Exception as e:
             logger.error(f"Error applying special adjustment for {team_code}: {e}")
         
-    return round(park_factor, 3)
+    return round(float(park_factor), 3)
+
+def _weather_readings(data):
+    """(temperature, wind speed, wind direction) from an OpenWeather payload, NaN direction if unknown"""
+    wind = data.get('wind', {})
+    wind_direction = wind.get('deg', 0)
+    return (data.get('main', {}).get('temp', 20), wind.get('speed', 0),
+            np.nan if wind_direction is None else wind_direction)
+
+def _as_text(values):
+    """Cell values as str, with None for missing (None, NaN, pd.NA) or non-string cells"""
+    return [value if isinstance(value, str) else None for value in values]
+
+def _team_code(home_team, ballpark):
+    """
+    Resolve the uppercase home team code for a prediction row,
+    inferring it from the ballpark name when home_team is missing.
+    """
+    if (not home_team or home_team == "Unknown") and isinstance(ballpark, str) and ballpark:
+        home_team = get_team_from_ballpark(ballpark)
+    
+    if isinstance(home_team, str) and home_team and home_team != "Unknown":
+        return home_team.upper()
+    return None
 
 def apply_enhanced_weather_boosts(df):
     """
@@ -312,137 +866,132 @@ def apply_enhanced_weather_boosts(df):
     ballpark_locations = get_ballpark_locations()
     ballpark_names = get_ballpark_names()
     
-    # Add columns for weather data if they don't exist
-    for col in ['wind_boost', 'park_factor', 'temperature', 'wind_speed', 'wind_direction']:
-        if col not in df.columns:
-            df[col] = 0.0 if col != 'wind_direction' else None
+    # Add columns for weather data if they don't exist, allocated in one go with
+    # numeric dtypes (NaN rather than None keeps an unknown wind direction numeric)
+    n = len(df)
+    defaults = {
+        'wind_boost': np.zeros(n, dtype=np.float32),
+        'park_factor': np.ones(n, dtype=np.float32),
+        'temperature': np.full(n, 20.0, dtype=np.float32),
+        'wind_speed': np.zeros(n, dtype=np.float32),
+        'wind_direction': np.full(n, np.nan, dtype=np.float32),
+    }
+    df = df.assign(**{col: values for col, values in defaults.items() if col not in df.columns})
     
-    # Apply team-specific park factors
-    for idx, row in df.iterrows():
-        try:
-            # Get home team and ballpark info
-            home_team = row.get('home_team')
-            ballpark = row.get('ballpark')
-            
-            # If we don't have either, we can't proceed
-            if not home_team and not ballpark:
-                logger.warning(f"⚠️ Row {idx} missing both home_team and ballpark data")
-                continue
-            
-            # Derive missing values from each other
-            if not home_team or home_team == "Unknown":
-                # Try to infer from ballpark name
-                if ballpark:
-                    home_team = next((team for team, name in ballpark_names.items() 
-                                    if name.lower() == ballpark.lower()), None)
-                    if home_team:
-                        df.at[idx, 'home_team'] = home_team
-                        logger.info(f"✅ Inferred home team {home_team} from ballpark {ballpark}")
-            
-            if not ballpark or ballpark == "Unknown Ballpark":
-                # Set ballpark name if we have home team
-                if home_team:
-                    df.at[idx, 'ballpark'] = ballpark_names.get(home_team.upper(), f"{home_team} Ballpark")
-                    logger.info(f"✅ Set ballpark to {df.at[idx, 'ballpark']} from team {home_team}")
-            
-            # Apply park factor if we have team info
-            if home_team and home_team != "Unknown":
-                # Ensure it's uppercase to match our dictionaries
-                home_team = home_team.upper()
-                
-                # Define weather conditions object for park factors
-                weather_conditions = {
-                    'batter_stands': row.get('batter_stands', 'R'),
-                    'temperature': 20,
-                    'wind_direction': None,
-                    'wind_speed': 0
-                }
-                
-                # Get location for weather
-                location = ballpark_locations.get(home_team)
-                if location and OPENWEATHER_API:
-                    # Weather API call
-                    try:
-                        weather_data = fetch_weather_data(location)
-                        if weather_data:
-                            wind_speed = weather_data.get('wind', {}).get('speed', 0)
-                            wind_direction = weather_data.get('wind', {}).get('deg', 0)
-                            temp = weather_data.get('main', {}).get('temp', 20)
-                            
-                            # Store weather data
-                            df.at[idx, 'temperature'] = temp
-                            df.at[idx, 'wind_speed'] = wind_speed
-                            df.at[idx, 'wind_direction'] = wind_direction
-                            
-                            # Update weather conditions for park factor
-                            weather_conditions.update({
-                                'temperature': temp,
-                                'wind_direction': wind_direction,
-                                'wind_speed': wind_speed
-                            })
-                            
-                            # Calculate enhanced wind boost
-                            df.at[idx, 'wind_boost'] = calculate_enhanced_wind_boost(
-                                wind_speed, wind_direction, temp
-                            )
-                            
-                            logger.info(f"🌡️ {df.at[idx, 'ballpark']}: {temp}°C, Wind: {wind_speed}m/s at {wind_direction}°")
-                    except Exception as e:
-                        logger.error(f"Error fetching or processing weather data: {e}")
-                
-                # Apply park factor (use enhanced version)
-                try:
-                    df.at[idx, 'park_factor'] = get_enhanced_park_factor(home_team, weather_conditions)
-                    logger.info(f"⚾ Applied park factor {df.at[idx, 'park_factor']} for {df.at[idx, 'ballpark']}")
-                except Exception as e:
-                    logger.error(f"Error applying park factor: {e}")
-                    df.at[idx, 'park_factor'] = 1.0
-            else:
-                logger.warning(f"⚠️ Unknown home team or ballpark for {row.get('batter_name')} vs {row.get('opposing_pitcher')}")
-                # Set default reasonable values
-                df.at[idx, 'park_factor'] = 1.0
-        except Exception as e:
-            logger.error(f"❌ Error processing weather for row {idx}: {e}")
-            # Set safe default values
-            df.at[idx, 'park_factor'] = 1.0
-            df.at[idx, 'wind_boost'] = 0.0
+    empty = pd.Series([None] * len(df), index=df.index, dtype=object)
+    home_teams = _as_text(df['home_team'] if 'home_team' in df.columns else empty)
+    ballparks = _as_text(df['ballpark'] if 'ballpark' in df.columns else empty)
+    
+    # Resolve each row's team once, then fetch weather once per unique city
+    # rather than once per row
+    team_codes = pd.Series(
+        [_team_code(team, park) for team, park in zip(home_teams, ballparks)],
+        index=df.index, dtype=object
+    )
+    valid = team_codes.notna().to_numpy()
+    
+    # If we have neither home team nor ballpark, we can't proceed
+    missing = np.array([not team and not park for team, park in zip(home_teams, ballparks)], dtype=bool)
+    if missing.any():
+        logger.warning(f"⚠️ {int(missing.sum())} rows missing both home_team and ballpark data")
+        if logger.isEnabledFor(logging.DEBUG):
+            for idx in df.index[missing]:
+                logger.debug(f"Row {idx} missing both home_team and ballpark data")
+    
+    # Derive missing values from each other: home team from the ballpark name...
+    inferred = valid & np.array(
+        [(not team or team == "Unknown") and bool(park) for team, park in zip(home_teams, ballparks)],
+        dtype=bool
+    )
+    if inferred.any():
+        df.loc[inferred, 'home_team'] = team_codes[inferred]
+        logger.info(f"✅ Inferred home team from ballpark name for {inferred.sum()} rows")
+    
+    # ...and the ballpark name from the home team
+    teams_after = _as_text(df['home_team'] if 'home_team' in df.columns else empty)
+    fill_ballpark = np.array(
+        [(not park or park == "Unknown Ballpark") and bool(team) for team, park in zip(teams_after, ballparks)],
+        dtype=bool
+    )
+    if fill_ballpark.any():
+        df.loc[fill_ballpark, 'ballpark'] = [
+            ballpark_names.get(team.upper(), f"{team} Ballpark")
+            for team, fill in zip(teams_after, fill_ballpark) if fill
+        ]
+        logger.info(f"✅ Set ballpark from home team for {fill_ballpark.sum()} rows")
+    
+    # Park factors are applied for rows with a known team, and a neutral factor
+    # for rows where the team couldn't be determined
+    codes = team_codes.to_numpy()
+    stands = np.array(_as_text(df['batter_stands']) if 'batter_stands' in df.columns else ['R'] * n, dtype=object)
+    unknown = ~missing & ~valid
+    if unknown.any():
+        logger.warning(f"⚠️ Unknown home team or ballpark for {int(unknown.sum())} rows")
+        if logger.isEnabledFor(logging.DEBUG):
+            for batter, pitcher in zip(df.get('batter_name', empty)[unknown], df.get('opposing_pitcher', empty)[unknown]):
+                logger.debug(f"Unknown home team or ballpark for {batter} vs {pitcher}")
     
+    # Without an API key there's no weather to fetch: apply the park factors in one
+    # pass (only the handedness adjustments can apply) and skip the weather steps
+    if not _WEATHER_ENABLED:
+        logger.warning("⚠️ OPENWEATHER_API not set, applying park factors without weather")
+        park_factors = compute_park_factors(codes, stands, np.full(n, np.nan), np.full(n, 20.0))
+        df['park_factor'] = df['park_factor'].where(missing, np.where(valid, park_factors, 1.0).astype(np.float32))
+        logger.info(f"⚾ Applied park factors to {int(valid.sum())} of {n} rows")
+        return df
+    
+    locations = team_codes.map(ballpark_locations)
+    roofed = team_codes.isin(ROOFED_PARKS).to_numpy()
+    location_weather = {}
+    try:
+        outdoor_locations = locations[~roofed].dropna().unique()
+        for location, result in fetch_all_weather(outdoor_locations).items():
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching weather data for {location}: {result}")
+            elif result:
+                location_weather[location] = result
+                logger.debug(f"🌡️ {location}: {result.get('main', {}).get('temp', 20)}°C, "
+                             f"Wind: {result.get('wind', {}).get('speed', 0)}m/s at "
+                             f"{result.get('wind', {}).get('deg', 0)}°")
+    except Exception as e:
+        logger.error(f"Error fetching weather data: {e}")
+    
+    # Weather depends only on the ballpark city, so read it once per unique location
+    # and broadcast to the rows by group (defaults where there's no weather); the
+    # extra last group catches rows with no location (factorize code -1)
+    location_codes, unique_locations = pd.factorize(locations)
+    group_weather = [location_weather.get(location) for location in unique_locations] + [None]
+    group_readings = np.array(
+        [_weather_readings(data) if data else NO_WEATHER_READINGS for data in group_weather],
+        dtype=float
+    )
+    readings = group_readings[location_codes]
+    readings[roofed] = _weather_readings(roofed_weather())
+    has_weather = valid & (roofed | np.array([bool(data) for data in group_weather])[location_codes])
+    readings[~has_weather] = NO_WEATHER_READINGS
+    temps, wind_speeds, wind_dirs = (np.ascontiguousarray(column) for column in readings.T)
+    
+    park_factors = np.where(valid, compute_park_factors(codes, stands, wind_dirs, temps), 1.0)
+    wind_boosts = calculate_enhanced_wind_boost_vec(wind_speeds, wind_dirs, temps)
+    wind_boosts[roofed] = 0.0  # Climate controlled, so no weather effect
+    
+    # Everything above is float64; only the stored columns are float32
+    df['temperature'] = df['temperature'].where(~has_weather, temps.astype(np.float32))
+    df['wind_speed'] = df['wind_speed'].where(~has_weather, wind_speeds.astype(np.float32))
+    df['wind_direction'] = df['wind_direction'].where(~has_weather, wind_dirs.astype(np.float32))
+    df['wind_boost'] = df['wind_boost'].where(~has_weather, wind_boosts.astype(np.float32))
+    df['park_factor'] = df['park_factor'].where(missing, park_factors.astype(np.float32))
+    
+    # Persist everything fetched for this slate in one write
+    flush_weather_cache()
+    
+    logger.info(f"⚾ Applied park factors to {int(valid.sum())} of {n} rows, weather to "
+                f"{int(has_weather.sum())} rows from {len(location_weather)} locations")
     return df
 
+# Backward compatibility for callers of the original weather function
+apply_weather_boosts = apply_enhanced_weather_boosts
+
 def get_park_factor(team_code):
     """Simplified function to get park factor by team code."""
-    # Same base factors as in the enhanced function
-    base_factors = {
-        "COL": 1.15,  # Coors Field - elevation helps HRs
-        "CIN": 1.10,  # Great American Ball Park - HR friendly
-        "NYY": 1.08,  # Yankee Stadium - short right field
-        "MIL": 1.06,  # American Family Field - retractable roof
-        "PHI": 1.05,  # Citizens Bank Park
-        "BAL": 1.04,  # Camden Yards 
-        "CHC": 1.02,  # Wrigley Field - depends on wind
-        "LAA": 1.02,  # Angel Stadium
-        "BOS": 1.01,  # Fenway Park
-        "TOR": 1.01,  # Rogers Centre
-        "ATL": 1.00,  # Truist Park
-        "CLE": 1.00,  # Progressive Field
-        "CWS": 1.00,  # Guaranteed Rate Field
-        "DET": 1.00,  # Comerica Park
-        "LAD": 0.99,  # Dodger Stadium
-        "STL": 0.99,  # Busch Stadium
-        "HOU": 0.98,  # Minute Maid Park
-        "MIN": 0.98,  # Target Field
-        "ARI": 0.97,  # Chase Field
-        "KC": 0.97,  # Kauffman Stadium
-        "NYM": 0.97,  # Citi Field
-        "OAK": 0.97,  # Oakland Coliseum
-        "PIT": 0.97,  # PNC Park
-        "TB": 0.97,  # Tropicana Field
-        "TEX": 0.97,  # Globe Life Field
-        "WSH": 0.97,  # Nationals Park
-        "MIA": 0.96,  # LoanDepot Park
-        "SEA": 0.95,  # T-Mobile Park
-        "SF": 0.90,   # Oracle Park - suppresses HRs
-        "SD": 0.92,   # Petco Park
-    }
-    
-    return base_factors.get(team_code.upper(), 1.0)
\ No newline at end of file
+    return PARK_FACTORS.get(team_code.upper(), 1.0)